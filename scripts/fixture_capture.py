@@ -6,55 +6,122 @@ import argparse
 import fnmatch
 import hashlib
 import json
+import os
 import re
+import threading
 import time
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from orjson import dumps as orjson_dumps  # type: ignore
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson_dumps = None
 
 SCRIPT_VERSION = "1.0.0"
 SCHEMA_VERSION = "1.0.0"
-
-HOME_RE = re.compile(r"/(Users|home)/[^/]+")
-UUID_RE = re.compile(
-    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b",
-    re.IGNORECASE,
+READ_CHUNK_BYTES = 1024 * 1024
+READ_BUFFERS = threading.local()
+# Each worker keeps its own read buffer, so the cap also bounds memory on
+# many-core hosts.
+DEFAULT_JOBS = min(16, os.cpu_count() or 1)
+SUFFIX_KINDS = {".jsonl": "log", ".json": "config"}
+CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+# Home paths, UUIDs and long hex ids are redacted in a single scan; the
+# alternation order matches the order the substitutions used to run in.
+# re.ASCII keeps \b in step with validate_fixture_manifest.py, which scans
+# with ASCII word boundaries (RE2's only kind).
+REDACT_RE = re.compile(
+    r"(?P<home>/(?:Users|home)/[^/]+)"
+    r"|(?P<uuid>(?i:\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b))"
+    r"|(?P<hex>(?i:\b[0-9a-f]{32,}\b))",
+    re.ASCII,
 )
-HEX_RE = re.compile(r"\b[0-9a-f]{32,}\b", re.IGNORECASE)
+REDACT_REPLACEMENTS = {"home": "/home/USER", "uuid": "<UUID>", "hex": "<HEX>"}
 IPV4_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 URL_HOST_RE = re.compile(r"(https?://)([^/\s]+)")
 USER_HOST_RE = re.compile(r"([A-Za-z0-9._%+-]+)@([A-Za-z0-9.-]+)")
 HOST_FLAG_RE = re.compile(r"(?P<prefix>--host(?:name)?(?:=|\s+))(?P<host>[^\s]+)")
 
+ExcludeMatcher = Callable[[str], Optional["re.Match[str]"]]
 
-def sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
 
+def read_buffer() -> memoryview:
+    # One reusable buffer per thread avoids a fresh allocation per chunk and per file.
+    view = getattr(READ_BUFFERS, "view", None)
+    if view is None:
+        view = memoryview(bytearray(READ_CHUNK_BYTES))
+        READ_BUFFERS.view = view
+    return view
 
-def canonical_manifest_bytes(manifest: Dict[str, Any]) -> bytes:
-    clone = dict(manifest)
-    clone.pop("manifest_sha256", None)
-    canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return canonical.encode("utf-8")
 
+def sha256_handle(handle: BinaryIO, size: Optional[int] = None) -> str:
+    # Reading into a fixed buffer keeps memory flat for any file size; an mmap
+    # would leave every page it touched resident until the map is closed.
+    digest = hashlib.sha256()
+    view = read_buffer()
+    if hasattr(os, "posix_fadvise") and (size is None or size > len(view)):
+        try:
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    remaining = size
+    while remaining is None or remaining > 0:
+        count = handle.readinto(view)
+        if not count:
+            break
+        digest.update(view[:count])
+        if remaining is not None:
+            remaining -= count
+    return digest.hexdigest()
 
-def redact_path(value: str) -> str:
-    return HOME_RE.sub("/home/USER", value)
 
+def sha256_file(path: Path) -> str:
+    with path.open("rb", buffering=0) as handle:
+        return sha256_handle(handle, os.fstat(handle.fileno()).st_size)
+
+
+def iter_canonical_chunks(value: Any, depth: int = 2) -> Iterator[str]:
+    # Containers near the root are emitted piecewise so no single buffer holds
+    # the whole manifest; deeper values go through the C encoder in one call,
+    # which is far faster than the pure-Python JSONEncoder.iterencode.
+    if depth and isinstance(value, dict):
+        yield "{"
+        for idx, key in enumerate(sorted(value)):
+            if idx:
+                yield ","
+            yield CANONICAL_ENCODER.encode(key)
+            yield ":"
+            yield from iter_canonical_chunks(value[key], depth - 1)
+        yield "}"
+    elif depth and isinstance(value, list):
+        yield "["
+        for idx, item in enumerate(value):
+            if idx:
+                yield ","
+            yield from iter_canonical_chunks(item, depth - 1)
+        yield "]"
+    else:
+        yield CANONICAL_ENCODER.encode(value)
+
+
+def canonical_digest(manifest: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    clone = {key: value for key, value in manifest.items() if key != "manifest_sha256"}
+    for chunk in iter_canonical_chunks(clone):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
 
-def redact_id(value: str) -> str:
-    value = UUID_RE.sub("<UUID>", value)
-    value = HEX_RE.sub("<HEX>", value)
-    return value
+
+def redact_match(match: "re.Match[str]") -> str:
+    return REDACT_REPLACEMENTS[match.lastgroup or ""]
 
 
 def redact_cmdline(value: str) -> str:
-    value = redact_path(value)
-    value = redact_id(value)
+    value = REDACT_RE.sub(redact_match, value)
     value = redact_hostname(value)
     return value
 
@@ -87,16 +154,25 @@ def parse_tool_versions(entries: Optional[List[str]]) -> Dict[str, str]:
     return tool_versions
 
 
-def should_exclude(rel_path: str, excludes: Iterable[str]) -> bool:
-    for pattern in excludes:
-        if fnmatch.fnmatch(rel_path, pattern):
-            return True
-    return False
+def compile_excludes(excludes: Iterable[str]) -> List[ExcludeMatcher]:
+    # fnmatch.fnmatch normalizes case on case-insensitive platforms; mirror that.
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    patterns = [fnmatch.translate(pattern) for pattern in dict.fromkeys(excludes)]
+    if not patterns:
+        return []
+    # One alternation lets the regex engine test every glob in a single call.
+    return [re.compile("|".join(patterns), flags).match]
 
 
-def infer_kind(rel_path: str) -> str:
-    name = Path(rel_path).name.lower()
-    if name.endswith(".jsonl"):
+def should_exclude(rel_path: str, matchers: Iterable[ExcludeMatcher]) -> bool:
+    return any(match(rel_path) for match in matchers)
+
+
+@lru_cache(maxsize=4096)
+def infer_kind_for_name(name: str) -> str:
+    dot = name.rfind(".")
+    suffix = name[dot:] if dot >= 0 else ""
+    if suffix == ".jsonl":
         return "log"
     if "policy" in name:
         return "policy"
@@ -104,9 +180,22 @@ def infer_kind(rel_path: str) -> str:
         return "priors"
     if name.endswith("manifest.json"):
         return "manifest"
-    if name.endswith(".json"):
-        return "config"
-    return "other"
+    return SUFFIX_KINDS.get(suffix, "other")
+
+
+def infer_kind(rel_path: str) -> str:
+    return infer_kind_for_name(rel_path.rsplit("/", 1)[-1].lower())
+
+
+def iter_files(root: str, prefix: str = "") -> Iterator[Tuple[os.DirEntry, str]]:
+    with os.scandir(root) as scanner:
+        children = list(scanner)
+    for entry in children:
+        rel_path = prefix + entry.name
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_files(entry.path, rel_path + "/")
+        elif not entry.is_dir():
+            yield entry, rel_path
 
 
 def gather_artifacts(
@@ -115,42 +204,100 @@ def gather_artifacts(
     manifest_path: Path,
     log_path: Optional[Path],
     redaction_profile: str,
+    jobs: int = DEFAULT_JOBS,
 ) -> List[Dict[str, Any]]:
-    entries: List[Dict[str, Any]] = []
-    for path in sorted(fixture_dir.rglob("*")):
-        if path.is_dir():
+    matchers = compile_excludes(excludes)
+    skip_paths = {os.fspath(manifest_path)}
+    if log_path:
+        skip_paths.add(os.fspath(log_path))
+
+    selected: List[Tuple[str, str, int]] = []
+    for entry, rel_path in iter_files(os.fspath(fixture_dir)):
+        if entry.path in skip_paths:
             continue
-        if path == manifest_path:
-            continue
-        if log_path and path == log_path:
-            continue
-        rel_path = path.relative_to(fixture_dir).as_posix()
-        if should_exclude(rel_path, excludes):
+        if should_exclude(rel_path, matchers):
             continue
+        selected.append((entry.path, rel_path, entry.stat().st_size))
+    # Only kept files are sorted; comparing path components matches the order
+    # sorted(rglob("*")) used to produce.
+    selected.sort(key=lambda item: item[1].split("/"))
+
+    def hash_one(item: Tuple[str, str, int]) -> str:
+        return sha256_file(Path(item[0]))
+
+    # hashlib releases the GIL while digesting, so threads scale across files.
+    if jobs > 1 and len(selected) > 1:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(selected))) as executor:
+            digests = list(executor.map(hash_one, selected))
+    else:
+        digests = [hash_one(item) for item in selected]
+
+    entries: List[Dict[str, Any]] = []
+    for (_, rel_path, size), digest in zip(selected, digests):
         entries.append(
             {
                 "path": rel_path,
                 "kind": infer_kind(rel_path),
-                "sha256": sha256_file(path),
-                "bytes": path.stat().st_size,
+                "sha256": digest,
+                "bytes": size,
                 "redaction_profile": redaction_profile,
             }
         )
     return entries
 
 
+def rfc3339_now() -> str:
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    tm = time.gmtime(seconds)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{nanos // 1000:06d}Z"
+    )
+
+
+def encode_log_line(payload: Dict[str, Any]) -> bytes:
+    if orjson_dumps is not None:
+        return orjson_dumps(payload) + b"\n"
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class JsonlLogger:
+    """Append JSONL events through one O_APPEND descriptor held for the block."""
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.fd: Optional[int] = None
+
+    def __enter__(self) -> "JsonlLogger":
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def emit(self, payload: Dict[str, Any]) -> None:
+        if self.fd is None:
+            raise RuntimeError(f"log not open: {self.log_path}")
+        # O_APPEND keeps each line contiguous even with concurrent writers.
+        view = memoryview(encode_log_line(payload))
+        while view:
+            view = view[os.write(self.fd, view) :]
+
+
 def write_log(
-    log_path: Path,
+    logger: JsonlLogger,
     event: str,
     fixture_id: str,
     duration_ms: int,
     artifacts: List[Dict[str, Any]],
     host_id: Optional[str],
 ) -> None:
-    log_path.parent.mkdir(parents=True, exist_ok=True)
     payload = {
         "event": event,
-        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "timestamp": rfc3339_now(),
         "fixture_id": fixture_id,
         "duration_ms": duration_ms,
         "artifacts": [
@@ -160,8 +307,7 @@ def write_log(
     }
     if host_id:
         payload["host_id"] = host_id
-    with log_path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(payload, separators=(",", ":")) + "\n")
+    logger.emit(payload)
 
 
 def build_manifest(
@@ -199,7 +345,7 @@ def build_manifest(
     if source_paths:
         manifest["source"]["paths"] = redact_values(source_paths)
 
-    manifest["manifest_sha256"] = hashlib.sha256(canonical_manifest_bytes(manifest)).hexdigest()
+    manifest["manifest_sha256"] = canonical_digest(manifest)
     return manifest
 
 
@@ -254,6 +400,12 @@ def main() -> int:
         action="store_true",
         help="Disable JSONL logging",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Parallel hashing workers (default: {DEFAULT_JOBS})",
+    )
 
     args = parser.parse_args()
 
@@ -261,9 +413,12 @@ def main() -> int:
     if not fixture_dir.exists():
         raise SystemExit(f"fixture_dir not found: {fixture_dir}")
 
+    if args.jobs < 1:
+        raise SystemExit(f"--jobs must be >= 1, got: {args.jobs}")
+
     capture_time = args.capture_time
     if capture_time is None:
-        capture_time = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        capture_time = rfc3339_now()
 
     tool_versions = parse_tool_versions(args.tool_version)
 
@@ -284,6 +439,7 @@ def main() -> int:
         manifest_path=output_path,
         log_path=log_path,
         redaction_profile=args.redaction_profile,
+        jobs=args.jobs,
     )
 
     manifest = build_manifest(
@@ -301,11 +457,14 @@ def main() -> int:
     )
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    with output_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, ensure_ascii=False)
+        handle.write("\n")
 
     duration_ms = int((time.time() - start) * 1000)
     if log_path is not None:
-        write_log(log_path, args.event, args.fixture_id, duration_ms, artifacts, args.host_id)
+        with JsonlLogger(log_path) as logger:
+            write_log(logger, args.event, args.fixture_id, duration_ms, artifacts, args.host_id)
 
     return 0
 
@@ -6,16 +6,46 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
 import re
 import sys
-from copy import deepcopy
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Used only for JSONL log lines, where nothing but run_id is compared: orjson turns
+# integers past 64 bits into floats, which would change the canonical manifest.
+try:
+    from orjson import loads as json_loads  # type: ignore
+except ImportError:  # pragma: no cover - optional accelerator
+    json_loads = json.loads
 
 SCHEMA_RELATIVE = Path("specs/schemas/e2e-artifact-manifest.schema.json")
-VERSION_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
-SHA256_RE = re.compile(r"^[a-f0-9]{64}$")
+HEX_DIGITS = frozenset("0123456789abcdef")
+RFC3339_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})", re.ASCII
+)
+READ_CHUNK_BYTES = 1024 * 1024
+READ_BUFFERS = threading.local()
+# Each worker keeps its own read buffer, so the cap also bounds memory on
+# many-core hosts.
+DEFAULT_JOBS = min(16, os.cpu_count() or 1)
+# Files below this size hash faster than a cache lookup pays for.
+HASH_CACHE_MIN_BYTES = 64 * 1024
+CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+HashCacheKey = Tuple[int, int, int, int, int]
+HASH_CACHE: Dict[HashCacheKey, str] = {}
+# Digests read from --hash-cache; only those looked up again this run are saved.
+LOADED_HASHES: Dict[HashCacheKey, str] = {}
+SchemaCheck = Callable[[Dict[str, Any]], Optional[str]]
+# (resolved path, expected byte size) -> (actual bytes, sha256 or None if skipped)
+FileCheck = Tuple[Path, Optional[int]]
+FileFacts = Tuple[int, Optional[str]]
 
 LOG_KINDS = {"jsonl", "text", "tap", "stdout", "stderr"}
 ARTIFACT_KINDS = {
@@ -50,41 +80,188 @@ def load_json(path: Path) -> Dict[str, Any]:
         raise SystemExit(f"invalid JSON in {path}: {exc}")
 
 
-def canonical_manifest_bytes(manifest: Dict[str, Any]) -> bytes:
-    clone = deepcopy(manifest)
-    clone.pop("manifest_sha256", None)
-    canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return canonical.encode("utf-8")
+def iter_canonical_chunks(value: Any, depth: int = 2) -> Iterator[str]:
+    # Containers near the root are emitted piecewise so no single buffer holds
+    # the whole manifest; deeper values go through the C encoder in one call,
+    # which is far faster than the pure-Python JSONEncoder.iterencode.
+    if depth and isinstance(value, dict):
+        yield "{"
+        for idx, key in enumerate(sorted(value)):
+            if idx:
+                yield ","
+            yield CANONICAL_ENCODER.encode(key)
+            yield ":"
+            yield from iter_canonical_chunks(value[key], depth - 1)
+        yield "}"
+    elif depth and isinstance(value, list):
+        yield "["
+        for idx, item in enumerate(value):
+            if idx:
+                yield ","
+            yield from iter_canonical_chunks(item, depth - 1)
+        yield "]"
+    else:
+        yield CANONICAL_ENCODER.encode(value)
+
+
+def canonical_digest(manifest: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    clone = {key: value for key, value in manifest.items() if key != "manifest_sha256"}
+    for chunk in iter_canonical_chunks(clone):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
 
 
-def sha256_bytes(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
+def read_buffer() -> memoryview:
+    # One reusable buffer per thread avoids a fresh allocation per chunk and per file.
+    view = getattr(READ_BUFFERS, "view", None)
+    if view is None:
+        view = memoryview(bytearray(READ_CHUNK_BYTES))
+        READ_BUFFERS.view = view
+    return view
 
 
-def sha256_file(path: Path) -> str:
+def sha256_handle(handle: BinaryIO, size: Optional[int] = None) -> str:
+    # Reading into a fixed buffer keeps memory flat for any file size; an mmap
+    # would leave every page it touched resident until the map is closed.
     digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
+    view = read_buffer()
+    if hasattr(os, "posix_fadvise") and (size is None or size > len(view)):
+        try:
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    remaining = size
+    while remaining is None or remaining > 0:
+        count = handle.readinto(view)
+        if not count:
+            break
+        digest.update(view[:count])
+        if remaining is not None:
+            remaining -= count
     return digest.hexdigest()
 
 
-def validate_schema_with_jsonschema(manifest: Dict[str, Any], schema_path: Path, errors: List[str]) -> None:
+def hash_cache_key(stat: os.stat_result) -> HashCacheKey:
+    # ctime cannot be set from userspace, so a file rewritten with a restored
+    # mtime still misses the cache.
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+
+def load_hash_cache(cache_path: Path) -> None:
+    try:
+        rows = json.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return
+    if not isinstance(rows, list):
+        return
+    for row in rows:
+        if (
+            isinstance(row, list)
+            and len(row) == 6
+            and all(isinstance(value, int) for value in row[:5])
+            and isinstance(row[5], str)
+        ):
+            LOADED_HASHES[tuple(row[:5])] = row[5]  # type: ignore[index]
+
+
+def save_hash_cache(cache_path: Path) -> None:
+    rows = [[*key, digest] for key, digest in HASH_CACHE.items()]
+    # Each writer gets its own temp file so parallel CI jobs can share a cache,
+    # and a cache that cannot be written only costs speed, never the result.
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps(rows, separators=(",", ":")))
+            os.replace(tmp_name, cache_path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+    except OSError as exc:
+        print(f"warning: hash cache not saved to {cache_path}: {exc}", file=sys.stderr)
+
+
+def sha256_file(path: Path) -> str:
+    key = None
+    stat = path.stat()
+    if stat.st_size >= HASH_CACHE_MIN_BYTES:
+        key = hash_cache_key(stat)
+        cached = HASH_CACHE.get(key) or LOADED_HASHES.get(key)
+        if cached is not None:
+            HASH_CACHE[key] = cached
+            return cached
+    digest = sha256_file_contents(path)
+    if key is not None:
+        HASH_CACHE[key] = digest
+    return digest
+
+
+def sha256_file_contents(path: Path) -> str:
+    with path.open("rb", buffering=0) as handle:
+        return sha256_handle(handle, os.fstat(handle.fileno()).st_size)
+
+
+@lru_cache(maxsize=8)
+def compile_schema_check(schema_path: Path, fast: bool = False) -> Optional[SchemaCheck]:
+    if fast:
+        try:
+            import fastjsonschema  # type: ignore
+        except Exception:
+            fastjsonschema = None
+        if fastjsonschema is not None:
+            # No format assertions and no default filling (which would mutate the
+            # manifest and change its canonical hash), as with jsonschema.
+            fast_validate = fastjsonschema.compile(
+                load_json(schema_path), use_default=False, use_formats=False
+            )
+
+            def check_fast(manifest: Dict[str, Any]) -> Optional[str]:
+                try:
+                    fast_validate(manifest)
+                except fastjsonschema.JsonSchemaValueException as exc:
+                    return exc.message
+                return None
+
+            return check_fast
+
     try:
         import jsonschema  # type: ignore
     except Exception:
-        return
+        return None
+    validator = jsonschema.Draft202012Validator(load_json(schema_path))
+
+    def check(manifest: Dict[str, Any]) -> Optional[str]:
+        # validate() raises the first iter_errors() result; report that same one.
+        error = next(validator.iter_errors(manifest), None)
+        return error.message if error is not None else None
+
+    return check
+
 
+def validate_schema_with_jsonschema(
+    manifest: Dict[str, Any], schema_path: Path, errors: List[str], fast: bool = False
+) -> None:
     try:
-        schema = load_json(schema_path)
-        jsonschema.Draft202012Validator(schema).validate(manifest)
-    except jsonschema.ValidationError as exc:
-        errors.append(f"schema validation failed: {exc.message}")
+        check = compile_schema_check(schema_path, fast)
+        message = check(manifest) if check is not None else None
     except Exception as exc:  # pragma: no cover - unexpected
         errors.append(f"schema validation error: {exc}")
+        return
+    if message is not None:
+        errors.append(f"schema validation failed: {message}")
 
 
 def parse_rfc3339(value: str) -> bool:
+    if not RFC3339_RE.fullmatch(value):
+        return False
+    # The shape is right; fromisoformat still rejects impossible dates (Feb 30).
     try:
         if value.endswith("Z"):
             value = value[:-1] + "+00:00"
@@ -94,39 +271,86 @@ def parse_rfc3339(value: str) -> bool:
         return False
 
 
+def is_sha256_hex(value: str) -> bool:
+    return len(value) == 64 and HEX_DIGITS.issuperset(value)
+
+
 def require_field(manifest: Dict[str, Any], field: str, errors: List[str]) -> None:
     if field not in manifest:
         errors.append(f"missing required field: {field}")
 
 
 def validate_version(version: str, errors: List[str]) -> None:
-    match = VERSION_RE.match(version)
-    if not match:
+    parts = version.split(".")
+    if len(parts) != 3 or not all(part.isdecimal() for part in parts):
         errors.append(f"schema_version not semver: {version}")
         return
-    major = int(match.group(1))
+    major = int(parts[0])
     if major != 1:
         errors.append(f"unsupported schema_version major: {version}")
 
 
-def validate_file_entry(entry: Dict[str, Any], base_dir: Path, label: str, errors: List[str]) -> None:
+def resolve_entry_path(entry: Dict[str, Any], base_dir: Path) -> Optional[Path]:
     path_value = entry.get("path")
     if not isinstance(path_value, str) or not path_value:
-        errors.append(f"{label} entry missing path")
-        return
+        return None
     path = Path(path_value)
     if not path.is_absolute():
         path = base_dir / path
+    return path
+
 
+def expected_size(entry: Dict[str, Any]) -> Optional[int]:
+    expected_bytes = entry.get("bytes")
+    return expected_bytes if isinstance(expected_bytes, int) else None
+
+
+def stat_and_hash(check: FileCheck) -> Optional[FileFacts]:
+    path, expected_bytes = check
     if not path.exists():
+        return None
+    actual_bytes = path.stat().st_size
+    if expected_bytes is not None and expected_bytes != actual_bytes:
+        # The size already proves a mismatch; don't spend a full hash on it.
+        return actual_bytes, None
+    return actual_bytes, sha256_file(path)
+
+
+def hash_files(checks: Iterable[FileCheck], jobs: int) -> Dict[FileCheck, Optional[FileFacts]]:
+    unique = list(dict.fromkeys(checks))
+    # hashlib releases the GIL while digesting, so threads scale across files.
+    if jobs > 1 and len(unique) > 1:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(unique))) as executor:
+            return dict(zip(unique, executor.map(stat_and_hash, unique)))
+    return {check: stat_and_hash(check) for check in unique}
+
+
+def validate_file_entry(
+    entry: Dict[str, Any],
+    base_dir: Path,
+    label: str,
+    errors: List[str],
+    file_facts: Optional[Dict[FileCheck, Optional[FileFacts]]] = None,
+) -> None:
+    path_value = entry.get("path")
+    path = resolve_entry_path(entry, base_dir)
+    if path is None:
+        errors.append(f"{label} entry missing path")
+        return
+
+    check = (path, expected_size(entry))
+    if file_facts is not None and check in file_facts:
+        facts = file_facts[check]
+    else:
+        facts = stat_and_hash(check)
+    if facts is None:
         errors.append(f"{label} file missing: {path}")
         return
 
     expected_hash = entry.get("sha256")
     expected_bytes = entry.get("bytes")
 
-    actual_bytes = path.stat().st_size
-    actual_hash = sha256_file(path)
+    actual_bytes, actual_hash = facts
 
     if not isinstance(expected_bytes, int):
         errors.append(f"{label} bytes missing for {path_value}")
@@ -135,9 +359,9 @@ def validate_file_entry(entry: Dict[str, Any], base_dir: Path, label: str, error
             f"{label} bytes mismatch for {path_value}: expected {expected_bytes}, got {actual_bytes}"
         )
 
-    if not isinstance(expected_hash, str) or not SHA256_RE.match(expected_hash):
+    if not isinstance(expected_hash, str) or not is_sha256_hex(expected_hash):
         errors.append(f"{label} sha256 invalid for {path_value}")
-    elif expected_hash != actual_hash:
+    elif actual_hash is not None and expected_hash != actual_hash:
         errors.append(
             f"{label} sha256 mismatch for {path_value}: expected {expected_hash}, got {actual_hash}"
         )
@@ -153,24 +377,35 @@ def validate_jsonl_run_id(entry: Dict[str, Any], base_dir: Path, run_id: str, er
     if not path.exists():
         return
 
-    with path.open("r", encoding="utf-8") as handle:
+    with path.open("rb") as handle:
         for idx, line in enumerate(handle, start=1):
             line = line.strip()
             if not line:
                 continue
             try:
-                payload = json.loads(line)
+                payload = json_loads(line)
             except json.JSONDecodeError:
-                errors.append(f"jsonl parse error in {path_value} line {idx}")
-                continue
+                # orjson is stricter than json (NaN, lone surrogates); only
+                # report lines the stdlib parser rejects too.
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError:
+                    errors.append(f"jsonl parse error in {path_value} line {idx}")
+                    continue
             if payload.get("run_id") != run_id:
                 errors.append(f"jsonl run_id mismatch in {path_value} line {idx}")
 
 
-def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path: Path) -> List[str]:
+def validate_manifest(
+    manifest: Dict[str, Any],
+    manifest_path: Path,
+    schema_path: Path,
+    fast: bool = False,
+    jobs: int = DEFAULT_JOBS,
+) -> List[str]:
     errors: List[str] = []
 
-    validate_schema_with_jsonschema(manifest, schema_path, errors)
+    validate_schema_with_jsonschema(manifest, schema_path, errors, fast)
 
     for field in [
         "schema_version",
@@ -216,9 +451,9 @@ def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path
 
     manifest_sha256 = manifest.get("manifest_sha256")
     if isinstance(manifest_sha256, str):
-        if not SHA256_RE.match(manifest_sha256):
+        if not is_sha256_hex(manifest_sha256):
             errors.append("manifest_sha256 not sha256 hex")
-        computed_hash = sha256_bytes(canonical_manifest_bytes(manifest))
+        computed_hash = canonical_digest(manifest)
         if manifest_sha256 != computed_hash:
             errors.append(
                 f"manifest_sha256 mismatch: expected {manifest_sha256}, got {computed_hash}"
@@ -246,6 +481,21 @@ def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path
         errors.append("commands must be non-empty array")
 
     logs = manifest.get("logs")
+    artifacts = manifest.get("artifacts")
+
+    # Hash every referenced file up front in parallel; errors are still
+    # reported sequentially below so output order stays deterministic.
+    file_checks: List[FileCheck] = []
+    for group in (logs, artifacts):
+        if not isinstance(group, list):
+            continue
+        for entry in group:
+            if isinstance(entry, dict):
+                path = resolve_entry_path(entry, base_dir)
+                if path is not None:
+                    file_checks.append((path, expected_size(entry)))
+    file_facts = hash_files(file_checks, jobs)
+
     if isinstance(logs, list):
         for entry in logs:
             if not isinstance(entry, dict):
@@ -254,13 +504,12 @@ def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path
             kind = entry.get("kind")
             if kind not in LOG_KINDS:
                 errors.append(f"log kind invalid: {kind}")
-            validate_file_entry(entry, base_dir, "log", errors)
+            validate_file_entry(entry, base_dir, "log", errors, file_facts)
             if entry.get("kind") == "jsonl" and run_id:
                 validate_jsonl_run_id(entry, base_dir, run_id, errors)
     else:
         errors.append("logs must be array")
 
-    artifacts = manifest.get("artifacts")
     if isinstance(artifacts, list):
         for entry in artifacts:
             if not isinstance(entry, dict):
@@ -269,7 +518,7 @@ def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path
             kind = entry.get("kind")
             if kind not in ARTIFACT_KINDS:
                 errors.append(f"artifact kind invalid: {kind}")
-            validate_file_entry(entry, base_dir, "artifact", errors)
+            validate_file_entry(entry, base_dir, "artifact", errors, file_facts)
             if kind in REDACTION_REQUIRED_KINDS and not entry.get("redaction_profile"):
                 errors.append(f"artifact {entry.get('path')} missing redaction_profile")
     else:
@@ -286,15 +535,43 @@ def main() -> int:
         default=None,
         help="Path to schema (default: specs/schemas/e2e-artifact-manifest.schema.json)",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "Use fastjsonschema for schema checks when installed "
+            "(draft-07 semantics, different error wording)"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Parallel hashing workers (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        default=None,
+        help="Reuse file digests across runs via this cache file (keyed by inode and mtime)",
+    )
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        raise SystemExit(f"--jobs must be >= 1, got: {args.jobs}")
     manifest_path = Path(args.manifest).resolve()
 
     repo_root = Path(__file__).resolve().parents[1]
     schema_path = Path(args.schema).resolve() if args.schema else (repo_root / SCHEMA_RELATIVE)
 
+    hash_cache_path = Path(args.hash_cache) if args.hash_cache else None
+    if hash_cache_path is not None:
+        load_hash_cache(hash_cache_path)
+
     manifest = load_json(manifest_path)
-    errors = validate_manifest(manifest, manifest_path, schema_path)
+    errors = validate_manifest(manifest, manifest_path, schema_path, fast=args.fast, jobs=args.jobs)
+
+    if hash_cache_path is not None:
+        save_hash_cache(hash_cache_path)
 
     if errors:
         for error in errors:
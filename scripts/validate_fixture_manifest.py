@@ -5,29 +5,65 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
 import re
 import sys
-from copy import deepcopy
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 
 SCHEMA_RELATIVE = Path("specs/schemas/fixture-manifest.schema.json")
 VERSION_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
 SHA256_RE = re.compile(r"^[a-f0-9]{64}$")
+RFC3339_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})", re.ASCII
+)
 REDACTION_PROFILES = {"minimal", "safe", "forensic", "custom"}
-
-HOME_RE = re.compile(r"/(Users|home)/[^/]+")
-UUID_RE = re.compile(
-    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b",
-    re.IGNORECASE,
+READ_CHUNK_BYTES = 1024 * 1024
+# Small artifacts are hashed directly; a cache entry would save nothing.
+HASH_CACHE_MIN_BYTES = 64 * 1024
+READ_BUFFERS = threading.local()
+# Each worker keeps its own read buffer, so the cap also bounds memory on
+# many-core hosts.
+DEFAULT_JOBS = min(16, os.cpu_count() or 1)
+
+# Home paths are checked on their own: "/home/<name>" runs to the next slash,
+# so scanning it in the same alternation would swallow any id after it.
+HOME_RE = re.compile(r"/(?:Users|home)/[^/]")
+# UUIDs and long hex ids share one scan (neither can hide the other), on RE2's
+# linear-time DFA when google-re2 is installed. RE2's \b is ASCII-only, so the
+# stdlib fallback uses re.ASCII to flag exactly the same strings.
+SENSITIVE_ID_PATTERN = (
+    r"(?P<uuid>(?i:\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b))"
+    r"|(?P<hex>(?i:\b[0-9a-f]{32,}\b))"
 )
-HEX_RE = re.compile(r"\b[0-9a-f]{32,}\b", re.IGNORECASE)
+SENSITIVE_ID_LABELS = (("uuid", "UUID"), ("hex", "hex id"))
 IPV4_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 URL_HOST_RE = re.compile(r"https?://([^/\s]+)")
 USER_HOST_RE = re.compile(r"[A-Za-z0-9._%+-]+@([A-Za-z0-9.-]+)")
 HOST_FLAG_RE = re.compile(r"(?P<prefix>--host(?:name)?(?:=|\s+))(?P<host>[^\s]+)")
 
+CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+SchemaCheck = Callable[[Dict[str, Any]], List[str]]
+_MISSING = object()
+HashCacheKey = Tuple[int, int, int, int, int]
+HASH_CACHE: Dict[HashCacheKey, str] = {}
+# Entries from the --hash-cache file; only the ones reused this run are written back.
+LOADED_HASHES: Dict[HashCacheKey, str] = {}
+
+
+@lru_cache(maxsize=None)
+def sensitive_id_re() -> Any:
+    # Compiled on first use so `--help` never pays for importing re2.
+    try:
+        import re2  # type: ignore
+    except ImportError:
+        return re.compile(SENSITIVE_ID_PATTERN, re.ASCII)
+    return re2.compile(SENSITIVE_ID_PATTERN)
+
 
 def is_redacted_host(host: str) -> bool:
     base = host.strip()
@@ -46,43 +82,176 @@ def load_json(path: Path) -> Dict[str, Any]:
         raise SystemExit(f"invalid JSON in {path}: {exc}")
 
 
-def canonical_manifest_bytes(manifest: Dict[str, Any]) -> bytes:
-    clone = deepcopy(manifest)
-    clone.pop("manifest_sha256", None)
-    canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return canonical.encode("utf-8")
+def iter_canonical_chunks(value: Any, depth: int = 2) -> Iterator[str]:
+    # Must stay byte-identical to json.dumps(sort_keys=True, separators=(",", ":"),
+    # ensure_ascii=False): fixture_capture.py signs manifests with the same walk.
+    if depth and isinstance(value, dict):
+        yield "{"
+        for idx, key in enumerate(sorted(value)):
+            if idx:
+                yield ","
+            yield CANONICAL_ENCODER.encode(key)
+            yield ":"
+            yield from iter_canonical_chunks(value[key], depth - 1)
+        yield "}"
+    elif depth and isinstance(value, list):
+        yield "["
+        for idx, item in enumerate(value):
+            if idx:
+                yield ","
+            yield from iter_canonical_chunks(item, depth - 1)
+        yield "]"
+    else:
+        yield CANONICAL_ENCODER.encode(value)
+
+
+def canonical_digest(manifest: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    # Shallow filter is enough: the encoder only reads the nested values.
+    clone = {key: value for key, value in manifest.items() if key != "manifest_sha256"}
+    for chunk in iter_canonical_chunks(clone):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
 
 
-def sha256_bytes(data: bytes) -> str:
-    return hashlib.sha256(data).hexdigest()
+def read_buffer() -> memoryview:
+    # One reusable buffer per thread avoids a fresh allocation per chunk and per file.
+    view = getattr(READ_BUFFERS, "view", None)
+    if view is None:
+        view = memoryview(bytearray(READ_CHUNK_BYTES))
+        READ_BUFFERS.view = view
+    return view
 
 
-def sha256_file(path: Path) -> str:
+def sha256_handle(handle: BinaryIO, size: Optional[int] = None) -> str:
+    # Reading into a fixed buffer keeps memory flat for any file size; an mmap
+    # would leave every page it touched resident until the map is closed.
     digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
+    view = read_buffer()
+    if hasattr(os, "posix_fadvise") and (size is None or size > len(view)):
+        try:
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    remaining = size
+    while remaining is None or remaining > 0:
+        count = handle.readinto(view)
+        if not count:
+            break
+        digest.update(view[:count])
+        if remaining is not None:
+            remaining -= count
     return digest.hexdigest()
 
 
-def validate_schema_with_jsonschema(
-    manifest: Dict[str, Any], schema_path: Path, errors: List[str]
-) -> None:
+def hash_cache_key(stat: os.stat_result) -> HashCacheKey:
+    # Any write bumps st_ctime_ns, even when the mtime is put back afterwards.
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+
+def load_hash_cache(cache_path: Path) -> None:
+    try:
+        rows = json.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return
+    if not isinstance(rows, list):
+        return
+    for row in rows:
+        if (
+            isinstance(row, list)
+            and len(row) == 6
+            and all(isinstance(value, int) for value in row[:5])
+            and isinstance(row[5], str)
+        ):
+            LOADED_HASHES[tuple(row[:5])] = row[5]  # type: ignore[index]
+
+
+def save_hash_cache(cache_path: Path) -> None:
+    import tempfile
+
+    rows = [[*key, digest] for key, digest in HASH_CACHE.items()]
+    # A private temp name per writer lets concurrent runs share one cache; the
+    # cache is only an accelerator, so failing to save it never fails the run.
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps(rows, separators=(",", ":")))
+            os.replace(tmp_name, cache_path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+    except OSError as exc:
+        print(f"warning: hash cache not saved to {cache_path}: {exc}", file=sys.stderr)
+
+
+def cached_sha256_handle(handle: BinaryIO, stat: os.stat_result) -> str:
+    if stat.st_size < HASH_CACHE_MIN_BYTES:
+        return sha256_handle(handle, stat.st_size)
+    key = hash_cache_key(stat)
+    cached = HASH_CACHE.get(key) or LOADED_HASHES.get(key)
+    if cached is None:
+        cached = sha256_handle(handle, stat.st_size)
+    HASH_CACHE[key] = cached
+    return cached
+
+
+@lru_cache(maxsize=None)
+def compile_schema_check(schema_path: Path, fast: bool = False) -> Optional[SchemaCheck]:
+    if fast:
+        try:
+            import fastjsonschema  # type: ignore
+        except Exception:
+            fastjsonschema = None
+        if fastjsonschema is not None:
+            # No format assertions or default filling, matching jsonschema and
+            # leaving the manifest (and its canonical hash) untouched.
+            fast_validate = fastjsonschema.compile(
+                load_json(schema_path), use_default=False, use_formats=False
+            )
+
+            def check_fast(manifest: Dict[str, Any]) -> List[str]:
+                try:
+                    fast_validate(manifest)
+                except fastjsonschema.JsonSchemaValueException as exc:
+                    return [exc.message]
+                return []
+
+            return check_fast
+
     try:
         import jsonschema  # type: ignore
     except Exception:
-        return
+        return None
+    validator = jsonschema.Draft202012Validator(load_json(schema_path))
+
+    def check(manifest: Dict[str, Any]) -> List[str]:
+        return [error.message for error in validator.iter_errors(manifest)]
 
+    return check
+
+
+def validate_schema_with_jsonschema(
+    manifest: Dict[str, Any], schema_path: Path, fast: bool = False
+) -> List[str]:
     try:
-        schema = load_json(schema_path)
-        jsonschema.Draft202012Validator(schema).validate(manifest)
-    except jsonschema.ValidationError as exc:
-        errors.append(f"schema validation failed: {exc.message}")
+        check = compile_schema_check(schema_path, fast)
+        messages = check(manifest) if check is not None else []
     except Exception as exc:  # pragma: no cover - unexpected
-        errors.append(f"schema validation error: {exc}")
+        return [f"schema validation error: {exc}"]
+    return [f"schema validation failed: {message}" for message in messages]
 
 
 def parse_rfc3339(value: str) -> bool:
+    if not RFC3339_RE.fullmatch(value):
+        return False
+    # The shape is right; fromisoformat still rejects impossible dates (Feb 30).
     try:
         if value.endswith("Z"):
             value = value[:-1] + "+00:00"
@@ -92,23 +261,24 @@ def parse_rfc3339(value: str) -> bool:
         return False
 
 
-def validate_version(version: str, errors: List[str]) -> None:
+def validate_version(version: str) -> List[str]:
     match = VERSION_RE.match(version)
     if not match:
-        errors.append(f"schema_version not semver: {version}")
-        return
+        return [f"schema_version not semver: {version}"]
     major = int(match.group(1))
     if major != 1:
-        errors.append(f"unsupported schema_version major: {version}")
+        return [f"unsupported schema_version major: {version}"]
+    return []
 
 
-def check_redaction(value: str, label: str, errors: List[str]) -> None:
+def check_redaction(value: str, label: str) -> List[str]:
+    errors: List[str] = []
     if HOME_RE.search(value):
         errors.append(f"{label} contains unredacted home path")
-    if UUID_RE.search(value):
-        errors.append(f"{label} contains unredacted UUID")
-    if HEX_RE.search(value):
-        errors.append(f"{label} contains unredacted hex id")
+    found = {match.lastgroup for match in sensitive_id_re().finditer(value)}
+    for group, description in SENSITIVE_ID_LABELS:
+        if group in found:
+            errors.append(f"{label} contains unredacted {description}")
     if IPV4_RE.search(value):
         errors.append(f"{label} contains unredacted IP address")
     for match in URL_HOST_RE.finditer(value):
@@ -120,9 +290,11 @@ def check_redaction(value: str, label: str, errors: List[str]) -> None:
     for match in HOST_FLAG_RE.finditer(value):
         if not is_redacted_host(match.group("host")):
             errors.append(f"{label} contains unredacted --host value")
+    return errors
 
 
-def validate_source(source: Dict[str, Any], errors: List[str]) -> None:
+def validate_source(source: Dict[str, Any]) -> List[str]:
+    errors: List[str] = []
     origin = source.get("origin")
     if not isinstance(origin, str) or not origin:
         errors.append("source.origin must be string")
@@ -138,54 +310,64 @@ def validate_source(source: Dict[str, Any], errors: List[str]) -> None:
             if not isinstance(item, str):
                 errors.append(f"source.{key}[{idx}] must be string")
                 continue
-            check_redaction(item, f"source.{key}[{idx}]", errors)
+            errors.extend(check_redaction(item, f"source.{key}[{idx}]"))
 
     notes = source.get("notes")
     if notes is not None and not isinstance(notes, str):
         errors.append("source.notes must be string")
+    return errors
 
 
-def validate_tool_versions(tool_versions: Dict[str, Any], errors: List[str]) -> None:
+def validate_tool_versions(tool_versions: Dict[str, Any]) -> List[str]:
+    errors: List[str] = []
     for key, value in tool_versions.items():
         if not isinstance(key, str) or not key:
             errors.append("tool_versions keys must be strings")
             continue
         if not isinstance(value, str) or not value:
             errors.append(f"tool_versions.{key} must be string")
+    return errors
 
 
-def validate_artifact_entry(
-    entry: Dict[str, Any], base_dir: Path, errors: List[str]
-) -> None:
+def validate_artifact_entry(entry: Dict[str, Any], base_dir: str) -> List[str]:
     path_value = entry.get("path")
     if not isinstance(path_value, str) or not path_value:
-        errors.append("artifact entry missing path")
-        return
+        return ["artifact entry missing path"]
 
-    path = Path(path_value)
-    if not path.is_absolute():
-        path = base_dir / path
+    # Plain strings keep the per-artifact cost off pathlib's object churn.
+    path = path_value if os.path.isabs(path_value) else os.path.join(base_dir, path_value)
 
-    if not path.exists():
-        errors.append(f"artifact file missing: {path}")
-        return
+    # One open() doubles as the existence check; size comes from the open fd.
+    try:
+        handle = open(path, "rb", buffering=0)
+    except FileNotFoundError:
+        return [f"artifact file missing: {path}"]
 
     expected_hash = entry.get("sha256")
     expected_bytes = entry.get("bytes")
+    hash_valid = isinstance(expected_hash, str) and bool(SHA256_RE.match(expected_hash))
+
+    with handle:
+        stat = os.fstat(handle.fileno())
+        actual_bytes = stat.st_size
+        size_mismatch = isinstance(expected_bytes, int) and expected_bytes != actual_bytes
+        # A size mismatch or malformed expected hash already fails the entry;
+        # don't spend a full hash proving it.
+        actual_hash = None
+        if hash_valid and not size_mismatch:
+            actual_hash = cached_sha256_handle(handle, stat)
 
-    actual_bytes = path.stat().st_size
-    actual_hash = sha256_file(path)
-
+    errors: List[str] = []
     if not isinstance(expected_bytes, int):
         errors.append(f"artifact bytes missing for {path_value}")
-    elif expected_bytes != actual_bytes:
+    elif size_mismatch:
         errors.append(
             f"artifact bytes mismatch for {path_value}: expected {expected_bytes}, got {actual_bytes}"
         )
 
-    if not isinstance(expected_hash, str) or not SHA256_RE.match(expected_hash):
+    if not hash_valid:
         errors.append(f"artifact sha256 invalid for {path_value}")
-    elif expected_hash != actual_hash:
+    elif actual_hash is not None and expected_hash != actual_hash:
         errors.append(
             f"artifact sha256 mismatch for {path_value}: expected {expected_hash}, got {actual_hash}"
         )
@@ -193,75 +375,95 @@ def validate_artifact_entry(
     redaction_profile = entry.get("redaction_profile")
     if redaction_profile not in REDACTION_PROFILES:
         errors.append(f"artifact redaction_profile invalid for {path_value}")
+    return errors
 
 
-def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path: Path) -> List[str]:
-    errors: List[str] = []
-
-    validate_schema_with_jsonschema(manifest, schema_path, errors)
-
-    for field in [
-        "schema_version",
-        "fixture_id",
-        "domain",
-        "capture_time",
-        "source",
-        "tool_versions",
-        "redaction_profile",
-        "artifacts",
-        "manifest_sha256",
-    ]:
-        if field not in manifest:
+def validate_manifest(
+    manifest: Dict[str, Any],
+    manifest_path: Path,
+    schema_path: Path,
+    fast: bool = False,
+    jobs: int = DEFAULT_JOBS,
+) -> List[str]:
+    errors = validate_schema_with_jsonschema(manifest, schema_path, fast)
+
+    schema_version = manifest.get("schema_version", _MISSING)
+    fixture_id = manifest.get("fixture_id", _MISSING)
+    domain = manifest.get("domain", _MISSING)
+    capture_time = manifest.get("capture_time", _MISSING)
+    source = manifest.get("source", _MISSING)
+    tool_versions = manifest.get("tool_versions", _MISSING)
+    redaction_profile = manifest.get("redaction_profile", _MISSING)
+    artifacts = manifest.get("artifacts", _MISSING)
+    manifest_sha = manifest.get("manifest_sha256", _MISSING)
+
+    for field, value in (
+        ("schema_version", schema_version),
+        ("fixture_id", fixture_id),
+        ("domain", domain),
+        ("capture_time", capture_time),
+        ("source", source),
+        ("tool_versions", tool_versions),
+        ("redaction_profile", redaction_profile),
+        ("artifacts", artifacts),
+        ("manifest_sha256", manifest_sha),
+    ):
+        if value is _MISSING:
             errors.append(f"missing required field: {field}")
 
-    schema_version = manifest.get("schema_version")
     if isinstance(schema_version, str):
-        validate_version(schema_version, errors)
+        errors.extend(validate_version(schema_version))
     else:
         errors.append("schema_version must be string")
 
-    if not isinstance(manifest.get("fixture_id"), str):
+    if not isinstance(fixture_id, str):
         errors.append("fixture_id must be string")
-    if not isinstance(manifest.get("domain"), str):
+    if not isinstance(domain, str):
         errors.append("domain must be string")
 
-    capture_time = manifest.get("capture_time")
     if isinstance(capture_time, str):
         if not parse_rfc3339(capture_time):
             errors.append("capture_time must be RFC3339 timestamp")
     else:
         errors.append("capture_time must be string")
 
-    source = manifest.get("source")
     if isinstance(source, dict):
-        validate_source(source, errors)
+        errors.extend(validate_source(source))
     else:
         errors.append("source must be object")
 
-    tool_versions = manifest.get("tool_versions")
     if isinstance(tool_versions, dict):
-        validate_tool_versions(tool_versions, errors)
+        errors.extend(validate_tool_versions(tool_versions))
     else:
         errors.append("tool_versions must be object")
 
-    redaction_profile = manifest.get("redaction_profile")
     if redaction_profile not in REDACTION_PROFILES:
         errors.append("redaction_profile must be one of minimal/safe/forensic/custom")
 
-    artifacts = manifest.get("artifacts")
     if isinstance(artifacts, list) and artifacts:
-        base_dir = manifest_path.parent
-        for entry in artifacts:
+        base_dir = os.fspath(manifest_path.parent)
+
+        def entry_errors(entry: Any) -> List[str]:
             if not isinstance(entry, dict):
-                errors.append("artifact entry must be object")
-                continue
-            validate_artifact_entry(entry, base_dir, errors)
+                return ["artifact entry must be object"]
+            return validate_artifact_entry(entry, base_dir)
+
+        # stat() and hashing release the GIL, so artifacts validate in parallel;
+        # map() keeps the per-entry error lists in manifest order.
+        if jobs > 1 and len(artifacts) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(jobs, len(artifacts))) as executor:
+                results = list(executor.map(entry_errors, artifacts))
+        else:
+            results = [entry_errors(entry) for entry in artifacts]
+        for local in results:
+            errors.extend(local)
     else:
         errors.append("artifacts must be non-empty list")
 
-    manifest_sha = manifest.get("manifest_sha256")
     if isinstance(manifest_sha, str) and SHA256_RE.match(manifest_sha):
-        computed = sha256_bytes(canonical_manifest_bytes(manifest))
+        computed = canonical_digest(manifest)
         if manifest_sha != computed:
             errors.append("manifest_sha256 mismatch")
     else:
@@ -272,22 +474,50 @@ def validate_manifest(manifest: Dict[str, Any], manifest_path: Path, schema_path
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Validate fixture manifest files.")
-    parser.add_argument("manifest", type=Path, help="Path to fixture manifest JSON")
+    parser.add_argument("manifests", type=Path, nargs="+", help="Path(s) to fixture manifest JSON")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Use fastjsonschema for schema checks when installed (reports first error only)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Parallel artifact validation workers (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        type=Path,
+        default=None,
+        help="Reuse file digests across runs via this cache file (keyed by inode and mtime)",
+    )
     args = parser.parse_args()
+    if args.jobs < 1:
+        raise SystemExit(f"--jobs must be >= 1, got: {args.jobs}")
 
-    manifest_path = args.manifest
     root = Path(__file__).resolve().parents[1]
     schema_path = root / SCHEMA_RELATIVE
 
-    manifest = load_json(manifest_path)
-    errors = validate_manifest(manifest, manifest_path, schema_path)
+    if args.hash_cache is not None:
+        load_hash_cache(args.hash_cache)
 
-    if errors:
+    failed = False
+    for manifest_path in args.manifests:
+        manifest = load_json(manifest_path)
+        errors = validate_manifest(
+            manifest, manifest_path, schema_path, fast=args.fast, jobs=args.jobs
+        )
         for error in errors:
+            if len(args.manifests) > 1:
+                error = f"{manifest_path}: {error}"
             print(error, file=sys.stderr)
-        return 1
+        failed = failed or bool(errors)
+
+    if args.hash_cache is not None:
+        save_hash_cache(args.hash_cache)
 
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
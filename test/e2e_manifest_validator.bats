@@ -114,3 +114,235 @@ PY
     run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" "$manifest_path"
     [ "$status" -ne 0 ]
 }
+
+@test "E2E manifest validator decodes every JSONL line for run_id" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "manifest_examples" / "daemon"
+workspace = Path(mkdtemp(prefix="e2e_manifest_runid_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+run_id = manifest["run_id"]
+log_path = workspace / "logs" / "daemon.jsonl"
+lines = [
+    json.dumps({"run_id": run_id, "event": "ok"}, separators=(",", ":")),
+    '{"ctx":{"run_id":"%s"},"run_id":"other"}' % run_id,
+    '{"run_id":"%s","run_id":"other"}' % run_id,
+    '{"run_id":"%s", broken}' % run_id,
+]
+data = ("\n".join(lines) + "\n").encode("utf-8")
+log_path.write_bytes(data)
+manifest["logs"][0]["sha256"] = hashlib.sha256(data).hexdigest()
+manifest["logs"][0]["bytes"] = len(data)
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" "$manifest_path"
+    [ "$status" -ne 0 ]
+    [[ "$output" != *"line 1"* ]]
+    [[ "$output" == *"jsonl run_id mismatch in logs/daemon.jsonl line 2"* ]]
+    [[ "$output" == *"jsonl run_id mismatch in logs/daemon.jsonl line 3"* ]]
+    [[ "$output" == *"jsonl parse error in logs/daemon.jsonl line 4"* ]]
+}
+
+@test "E2E manifest validator hash cache rejects rewritten artifacts" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "manifest_examples" / "tui"
+workspace = Path(mkdtemp(prefix="e2e_manifest_hashcache_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+# Large enough to go through the cache (>= 64 KiB).
+data = b"a" * (256 * 1024)
+(workspace / "snapshots" / "large_snapshot.bin").write_bytes(data)
+manifest["artifacts"].append(
+    {
+        "path": "snapshots/large_snapshot.bin",
+        "kind": "snapshot",
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+        "redaction_profile": "safe",
+    }
+)
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+# A stale entry for a file that no longer exists must not survive a run.
+(workspace / "hash_cache.json").write_text(json.dumps([[1, 2, 3, 4, 5, "0" * 64]]), encoding="utf-8")
+print(workspace)
+PY
+    [ "$status" -eq 0 ]
+    workspace="$output"
+
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --hash-cache "$workspace/hash_cache.json" "$workspace/manifest.json"
+    [ "$status" -eq 0 ]
+
+    run python3 - "$workspace" <<'PY'
+import json
+import os
+import sys
+from pathlib import Path
+workspace = Path(sys.argv[1])
+rows = json.loads((workspace / "hash_cache.json").read_text(encoding="utf-8"))
+assert len(rows) == 1, rows
+assert rows[0][:5] != [1, 2, 3, 4, 5], rows
+target = workspace / "snapshots" / "large_snapshot.bin"
+before = target.stat()
+target.write_bytes(b"b" * before.st_size)
+os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns))
+PY
+    [ "$status" -eq 0 ]
+
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --hash-cache "$workspace/hash_cache.json" "$workspace/manifest.json"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"sha256 mismatch for snapshots/large_snapshot.bin"* ]]
+}
+
+@test "E2E manifest validator reports bad sha256 format alongside bytes mismatch" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "manifest_examples" / "tui"
+workspace = Path(mkdtemp(prefix="e2e_manifest_badsize_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+entry = manifest["artifacts"][0]
+entry["bytes"] += 1
+entry["sha256"] = "not-a-digest"
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" "$manifest_path"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"artifact bytes mismatch for snapshots/tui_snapshot.json"* ]]
+    [[ "$output" == *"artifact sha256 invalid for snapshots/tui_snapshot.json"* ]]
+}
+
+@test "E2E manifest validator keeps integers past 64 bits exact" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "manifest_examples" / "tui"
+workspace = Path(mkdtemp(prefix="e2e_manifest_bigint_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+manifest["metrics"]["counts"]["events"] = 10**20
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" "$manifest_path"
+    [ "$status" -eq 0 ]
+}
+
+@test "E2E manifest validator tolerates shared or unwritable hash caches" {
+    manifest_path="$PROJECT_ROOT/test/fixtures/manifest_examples/tui/manifest.json"
+    workspace="$(mktemp -d "${BATS_TMPDIR:-/tmp}/e2e_manifest_cachesave_XXXXXX")"
+    touch "$workspace/not_a_dir"
+
+    # The cache's parent is a regular file: saving fails, validation must not.
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --hash-cache "$workspace/not_a_dir/cache.json" "$manifest_path"
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"hash cache not saved"* ]]
+
+    # Concurrent writers must not trip over each other's temp files.
+    local pids=()
+    for worker in 1 2 3 4; do
+        (
+            for _ in 1 2 3 4 5 6 7 8; do
+                "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --hash-cache "$workspace/cache.json" "$manifest_path" >/dev/null || exit 1
+            done
+        ) &
+        pids+=("$!")
+    done
+    for pid in "${pids[@]}"; do
+        wait "$pid"
+    done
+    [ -z "$(find "$workspace" -name '*.tmp')" ]
+}
+
+@test "E2E manifest validator reports jsonschema errors unless --fast" {
+    if ! python3 -c "import jsonschema" 2>/dev/null; then
+        skip "jsonschema not installed"
+    fi
+
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "manifest_examples" / "tui"
+workspace = Path(mkdtemp(prefix="e2e_manifest_schema_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+manifest["env"]["os"] = 5
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" "$manifest_path"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"schema validation failed: 5 is not of type 'string'"* ]]
+
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --fast "$manifest_path"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"schema validation failed"* ]]
+
+    run "$PROJECT_ROOT/scripts/validate_e2e_manifest.py" --fast "$PROJECT_ROOT/test/fixtures/manifest_examples/tui/manifest.json"
+    [ "$status" -eq 0 ]
+}
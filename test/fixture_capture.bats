@@ -0,0 +1,76 @@
+#!/usr/bin/env bats
+
+setup() {
+    TEST_DIR="$( cd "$( dirname "$BATS_TEST_FILENAME" )" && pwd )"
+    PROJECT_ROOT="$(dirname "$TEST_DIR")"
+    export PROJECT_ROOT
+}
+
+@test "Fixture capture redacts ids its validator flags" {
+    workspace="$(mktemp -d "${BATS_TMPDIR:-/tmp}/fixture_capture_redact_XXXXXX")"
+    printf '{"ok": true}\n' > "$workspace/policy.json"
+
+    run "$PROJECT_ROOT/scripts/fixture_capture.py" "$workspace" \
+        --fixture-id redact-ascii \
+        --domain test \
+        --capture-time 2026-01-01T00:00:00Z \
+        --command "run --id=é0123456789abcdef0123456789abcdef" \
+        --command "run --id=Ωdeadbeef-dead-beef-dead-beefdeadbeef"
+    [ "$status" -eq 0 ]
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$workspace/fixture_manifest.json"
+    [ "$status" -eq 0 ]
+}
+
+@test "Fixture capture walks, orders, excludes and classifies artifacts" {
+    workspace="$(mktemp -d "${BATS_TMPDIR:-/tmp}/fixture_capture_walk_XXXXXX")"
+    mkdir -p "$workspace/a" "$workspace/a-b" "$workspace/a b" "$workspace/real/deep" "$workspace/cache"
+    printf '{}\n' > "$workspace/a/b"
+    printf '{}\n' > "$workspace/a-b/x.json"
+    printf '{}\n' > "$workspace/a b/x.jsonl"
+    printf '{}\n' > "$workspace/a.b"
+    printf '{}\n' > "$workspace/policy.json"
+    printf '{}\n' > "$workspace/real/deep/z.json"
+    printf 'scratch\n' > "$workspace/real/scratch.tmp"
+    printf '{}\n' > "$workspace/cache/c.json"
+    ln -s real "$workspace/link"
+
+    run "$PROJECT_ROOT/scripts/fixture_capture.py" "$workspace" \
+        --fixture-id walk-order \
+        --domain test \
+        --capture-time 2026-01-01T00:00:00Z \
+        --command "run --id 123e4567-e89b-12d3-a456-426614174000" \
+        --exclude "*.tmp" \
+        --exclude "cache/*"
+    [ "$status" -eq 0 ]
+
+    run python3 - "$workspace" <<'PY'
+import json
+import sys
+from pathlib import Path
+workspace = Path(sys.argv[1])
+manifest = json.loads((workspace / "fixture_manifest.json").read_text(encoding="utf-8"))
+artifacts = [(entry["path"], entry["kind"]) for entry in manifest["artifacts"]]
+# Paths sort component-wise, so "a/b" precedes "a b/..." and "a-b/..."; the
+# symlinked directory is not followed and excluded globs are dropped.
+expected = [
+    ("a/b", "other"),
+    ("a b/x.jsonl", "log"),
+    ("a-b/x.json", "config"),
+    ("a.b", "other"),
+    ("policy.json", "policy"),
+    ("real/deep/z.json", "config"),
+]
+assert artifacts == expected, artifacts
+assert manifest["source"]["command"] == ["run --id <UUID>"], manifest["source"]
+log_lines = (workspace / "logs" / "fixture_capture.jsonl").read_text(encoding="utf-8").splitlines()
+assert len(log_lines) == 1, log_lines
+event = json.loads(log_lines[0])
+assert event["event"] == "fixture_capture", event
+assert [entry["path"] for entry in event["artifacts"]] == [path for path, _ in expected], event
+PY
+    [ "$status" -eq 0 ]
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$workspace/fixture_manifest.json"
+    [ "$status" -eq 0 ]
+}
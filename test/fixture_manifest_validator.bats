@@ -84,3 +84,227 @@ PY
     run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$manifest_path"
     [ "$status" -ne 0 ]
 }
+
+@test "Fixture manifest validator hash cache rejects rewritten artifacts" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "config"
+workspace = Path(mkdtemp(prefix="fixture_manifest_hashcache_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "fixture_manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+# Large enough to go through the cache (>= 64 KiB).
+data = b"a" * (256 * 1024)
+(workspace / "large_artifact.bin").write_bytes(data)
+manifest["artifacts"].append(
+    {
+        "path": "large_artifact.bin",
+        "kind": "other",
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+        "redaction_profile": "safe",
+    }
+)
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+# A stale entry for a file that no longer exists must not survive a run.
+(workspace / "hash_cache.json").write_text(json.dumps([[1, 2, 3, 4, 5, "0" * 64]]), encoding="utf-8")
+print(workspace)
+PY
+    [ "$status" -eq 0 ]
+    workspace="$output"
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --hash-cache "$workspace/hash_cache.json" "$workspace/fixture_manifest.json"
+    [ "$status" -eq 0 ]
+
+    run python3 - "$workspace" <<'PY'
+import json
+import os
+import sys
+from pathlib import Path
+workspace = Path(sys.argv[1])
+rows = json.loads((workspace / "hash_cache.json").read_text(encoding="utf-8"))
+assert len(rows) == 1, rows
+assert rows[0][:5] != [1, 2, 3, 4, 5], rows
+target = workspace / "large_artifact.bin"
+before = target.stat()
+target.write_bytes(b"b" * before.st_size)
+os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns))
+PY
+    [ "$status" -eq 0 ]
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --hash-cache "$workspace/hash_cache.json" "$workspace/fixture_manifest.json"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"artifact sha256 mismatch for large_artifact.bin"* ]]
+}
+
+@test "Fixture manifest validator prefixes errors per manifest" {
+    run python3 - <<'PY'
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "config"
+workspace = Path(mkdtemp(prefix="fixture_manifest_multi_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+(workspace / "valid_policy.json").write_text("tampered\n", encoding="utf-8")
+print(workspace / "fixture_manifest.json")
+PY
+    [ "$status" -eq 0 ]
+    bad_manifest="$output"
+    good_manifest="$PROJECT_ROOT/test/fixtures/pt-core/fixture_manifest.json"
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$good_manifest" "$bad_manifest"
+    [ "$status" -eq 1 ]
+    [ "${#lines[@]}" -gt 0 ]
+    for line in "${lines[@]}"; do
+        [[ "$line" == "$bad_manifest: "* ]]
+    done
+    [[ "$output" == *"$bad_manifest: artifact "*"valid_policy.json"* ]]
+    [[ "$output" != *"$good_manifest"* ]]
+}
+
+@test "Fixture manifest validator reports schema errors with and without --fast" {
+    if ! python3 -c "import jsonschema" 2>/dev/null; then
+        skip "jsonschema not installed"
+    fi
+
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "config"
+workspace = Path(mkdtemp(prefix="fixture_manifest_fast_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "fixture_manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+manifest["artifacts"][0]["kind"] = "bogus"
+manifest["artifacts"][1]["kind"] = "bogus"
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --fast "$PROJECT_ROOT/test/fixtures/config/fixture_manifest.json"
+    [ "$status" -eq 0 ]
+
+    # The default path reports every schema violation, not just the first.
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$manifest_path"
+    [ "$status" -eq 1 ]
+    [ "$(grep -c "schema validation failed" <<<"$output")" -eq 2 ]
+
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --fast "$manifest_path"
+    [ "$status" -eq 1 ]
+    [[ "$output" == *"schema validation failed"* ]]
+}
+
+@test "Canonical manifest digests match json.dumps in every script" {
+    run python3 - <<'PY'
+import hashlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+root = Path(os.environ["PROJECT_ROOT"])
+manifest = {
+    "manifest_sha256": "0" * 64,
+    "fixture_id": "café-日本-\U0001f600",
+    "floats": [1e-05, 0.1, -0.0, 1e300, 2.5, 10**20],
+    "empty": {"dict": {}, "list": [], "nested": [{}, [], [[]], {"x": {}}]},
+    "artifacts": [
+        {"path": "a\"b\\c.json", "bytes": 0, "note": None, "ok": True},
+        {"é": 1, "Z": 2, "a": 3, "": [None, False]},
+    ],
+    "ü": {"é": " "},
+}
+clone = {key: value for key, value in manifest.items() if key != "manifest_sha256"}
+expected = hashlib.sha256(
+    json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+).hexdigest()
+for name in ("fixture_capture", "validate_fixture_manifest", "validate_e2e_manifest"):
+    spec = importlib.util.spec_from_file_location(name, root / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    actual = module.canonical_digest(manifest)
+    assert actual == expected, (name, actual, expected)
+PY
+    [ "$status" -eq 0 ]
+}
+
+@test "Fixture manifest validator tolerates shared or unwritable hash caches" {
+    manifest_path="$PROJECT_ROOT/test/fixtures/config/fixture_manifest.json"
+    workspace="$(mktemp -d "${BATS_TMPDIR:-/tmp}/fixture_manifest_cachesave_XXXXXX")"
+    touch "$workspace/not_a_dir"
+
+    # The cache's parent is a regular file: saving fails, validation must not.
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --hash-cache "$workspace/not_a_dir/cache.json" "$manifest_path"
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"hash cache not saved"* ]]
+
+    # Concurrent writers must not trip over each other's temp files.
+    local pids=()
+    for worker in 1 2 3 4; do
+        (
+            for _ in 1 2 3 4 5 6 7 8; do
+                "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" --hash-cache "$workspace/cache.json" "$manifest_path" || exit 1
+            done
+        ) &
+        pids+=("$!")
+    done
+    for pid in "${pids[@]}"; do
+        wait "$pid"
+    done
+    [ -z "$(find "$workspace" -name '*.tmp')" ]
+}
+
+@test "Fixture manifest validator reports ids that follow a home path" {
+    run python3 - <<'PY'
+import json
+import hashlib
+import os
+from pathlib import Path
+from shutil import copytree
+from tempfile import mkdtemp
+root = Path(os.environ["PROJECT_ROOT"])
+source_dir = root / "test" / "fixtures" / "pt-core"
+workspace = Path(mkdtemp(prefix="fixture_manifest_homeid_"))
+copytree(source_dir, workspace, dirs_exist_ok=True)
+manifest_path = workspace / "fixture_manifest.json"
+manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+manifest.setdefault("source", {})["command"] = [
+    "run /home/alice 123e4567-e89b-12d3-a456-426614174000 0123456789abcdef0123456789abcdef"
+]
+clone = dict(manifest)
+clone.pop("manifest_sha256", None)
+canonical = json.dumps(clone, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+manifest["manifest_sha256"] = hashlib.sha256(canonical).hexdigest()
+manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+print(manifest_path)
+PY
+    [ "$status" -eq 0 ]
+    manifest_path="$output"
+    run "$PROJECT_ROOT/scripts/validate_fixture_manifest.py" "$manifest_path"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"source.command[0] contains unredacted home path"* ]]
+    [[ "$output" == *"source.command[0] contains unredacted UUID"* ]]
+    [[ "$output" == *"source.command[0] contains unredacted hex id"* ]]
+}